@@ -0,0 +1,179 @@
+import os
+import json
+import math
+import time
+import logging
+import statistics
+import chromadb
+from sentence_transformers import SentenceTransformer
+from src.rag_steps import retrieve_context, generate_answer
+from src.verse_index import VerseIndex
+
+# Run from the repository root: python -m scripts.evaluation.eval_retrieval
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+VECTOR_DB_PATH = os.path.join(REPO_ROOT, 'vector_db')
+VERSE_CORPUS_PATH = os.path.join(REPO_ROOT, 'data', 'processed', 'sb_corpus.parquet')
+QUESTIONS_FILE = os.path.join(REPO_ROOT, 'data', 'eval', 'sb_questions.jsonl')
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_COLLECTION = "prabhupada_purports"
+
+# One row of the report per configuration. A different chunker is compared by
+# indexing it into its own collection and pointing 'collection' at it. Verse mode
+# without neighbours puts the same references in the prompt as chunk mode at the
+# same k, so it is left out: only its latency would differ.
+CONFIGS = [
+    {'name': 'chunk k=3', 'collection': DEFAULT_COLLECTION, 'mode': 'chunk', 'k': 3},
+    {'name': 'chunk k=5', 'collection': DEFAULT_COLLECTION, 'mode': 'chunk', 'k': 5},
+    {'name': 'chunk k=10', 'collection': DEFAULT_COLLECTION, 'mode': 'chunk', 'k': 10},
+    {'name': 'verse k=3 +-1', 'collection': DEFAULT_COLLECTION, 'mode': 'verse', 'k': 3, 'neighbours': 1},
+    {'name': 'verse k=5 +-1', 'collection': DEFAULT_COLLECTION, 'mode': 'verse', 'k': 5, 'neighbours': 1},
+    {'name': 'verse k=5 +-2', 'collection': DEFAULT_COLLECTION, 'mode': 'verse', 'k': 5, 'neighbours': 2},
+]
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+        self.parts = [text]
+        self.prompt_feedback = None
+
+class StubGenerationModel:
+    """Stands in for the Gemini model so the pipeline runs offline with no generation cost."""
+
+    def generate_content(self, prompt):
+        return _StubResponse(f"Stub answer ({len(prompt)} prompt chars)")
+
+def load_questions(filepath):
+    questions = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                questions.append(json.loads(line))
+    logging.info(f"Loaded {len(questions)} labelled questions")
+    return questions
+
+def ranked_references(context_chunks):
+    """References in the order they appear in the prompt context, neighbours after their parent."""
+    refs = []
+    for chunk in context_chunks:
+        metadata = chunk.get('metadata', {})
+        for ref in [metadata.get('reference')] + metadata.get('neighbour_references', []):
+            if ref and ref not in refs:
+                refs.append(ref)
+    return refs
+
+def recall(ranked, expected):
+    if not expected:
+        return 0.0
+    return len(set(ranked) & set(expected)) / len(set(expected))
+
+def reciprocal_rank(ranked, expected):
+    for rank, ref in enumerate(ranked, start=1):
+        if ref in expected:
+            return 1.0 / rank
+    return 0.0
+
+def ndcg_at_k(ranked, expected, k):
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, ref in enumerate(ranked[:k], start=1) if ref in expected)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(set(expected)), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+def run_pipeline(question, config, embedding_model, collection, verse_index, generation_model):
+    """Retrieve and answer the way get_rag_response does, returning the context that was prompted."""
+    context_chunks = retrieve_context(
+        question, embedding_model, collection, config['k'],
+        verse_index=verse_index if config['mode'] == 'verse' else None,
+        n_neighbours=config.get('neighbours', 0)
+    )
+    if context_chunks:
+        generate_answer(question, context_chunks, generation_model)
+    return context_chunks
+
+def evaluate_config(config, questions, embedding_model, collection, verse_index, generation_model):
+    k = config['k']
+    recalls, rrs, ndcgs, context_recalls, ref_counts, latencies = [], [], [], [], [], []
+    run_pipeline(questions[0]['question'], config, embedding_model, collection, verse_index, generation_model)
+    for item in questions:
+        start = time.perf_counter()
+        context_chunks = run_pipeline(item['question'], config, embedding_model, collection, verse_index, generation_model)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ranked = ranked_references(context_chunks)
+        expected = item['expected_references']
+        # Quality is scored at depth k so every configuration is judged on the same number
+        # of references; whatever neighbour expansion adds beyond that is context_recall.
+        recalls.append(recall(ranked[:k], expected))
+        rrs.append(reciprocal_rank(ranked[:k], expected))
+        ndcgs.append(ndcg_at_k(ranked, expected, k))
+        context_recalls.append(recall(ranked, expected))
+        ref_counts.append(len(ranked))
+    latencies.sort()
+    return {
+        'name': config['name'],
+        'refs': statistics.mean(ref_counts),
+        'recall': statistics.mean(recalls),
+        'mrr': statistics.mean(rrs),
+        'ndcg': statistics.mean(ndcgs),
+        'context_recall': statistics.mean(context_recalls),
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)],
+    }
+
+def format_table(rows):
+    """recall@k, MRR@k and nDCG@k use the first k context references; 'ctx recall' and
+    'refs' cover the whole prompt context, neighbours included."""
+    header = (f"{'config':<16} {'recall@k':>8} {'MRR@k':>7} {'nDCG@k':>7} {'ctx recall':>10} {'refs':>5} "
+              f"{'p50 ms':>8} {'p95 ms':>8}")
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<16} {row['recall']:>8.3f} {row['mrr']:>7.3f} {row['ndcg']:>7.3f} "
+            f"{row['context_recall']:>10.3f} {row['refs']:>5.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+        )
+    return '\n'.join(lines)
+
+def main():
+    logging.info("Starting retrieval evaluation...")
+    questions = load_questions(QUESTIONS_FILE)
+    if not questions:
+        logging.error("No labelled questions found.")
+        return
+
+    try:
+        client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+        embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    except Exception as e:
+        logging.error(f"Setup error: {e}")
+        return
+
+    verse_index = None
+    if any(config['mode'] == 'verse' for config in CONFIGS):
+        try:
+            verse_index = VerseIndex.from_parquet(VERSE_CORPUS_PATH)
+        except Exception as e:
+            logging.warning(f"Verse index unavailable, skipping verse configs: {e}")
+
+    generation_model = StubGenerationModel()
+    collections = {}
+    rows = []
+    for config in CONFIGS:
+        if config['mode'] == 'verse' and verse_index is None:
+            continue
+        try:
+            if config['collection'] not in collections:
+                collections[config['collection']] = client.get_collection(name=config['collection'])
+        except Exception as e:
+            logging.error(f"Collection '{config['collection']}' unavailable: {e}")
+            continue
+        logging.info(f"Evaluating '{config['name']}'")
+        rows.append(evaluate_config(
+            config, questions, embedding_model, collections[config['collection']], verse_index, generation_model
+        ))
+
+    print()
+    print(format_table(rows))
+    logging.info("Retrieval evaluation finished.")
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,10 @@ import uuid
 import chromadb
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm 
-RAW_DATA_FILE = '../../data/raw/raw_data.jsonl'
-VECTOR_DB_PATH = '../../vector_db' 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+RAW_DATA_FILE = os.path.join(REPO_ROOT, 'data', 'raw', 'raw_data.jsonl')
+CORPUS_FILE = os.path.join(REPO_ROOT, 'data', 'processed', 'sb_corpus.parquet')
+VECTOR_DB_PATH = os.path.join(REPO_ROOT, 'vector_db')
 COLLECTION_NAME = "prabhupada_purports"
 EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
 CHUNK_SEPARATOR = "\n\n"
@@ -25,6 +27,16 @@ def load_data(filepath):
         return None
     logging.info(f"Loaded {len(records)} records")
     return records
+def load_corpus(filepath):
+    # pyarrow is only needed once extract_corpus has produced a corpus file.
+    import pyarrow.parquet as pq
+    try:
+        table = pq.read_table(filepath)
+    except FileNotFoundError:
+        logging.error(f"Corpus file not found: {filepath}")
+        return None
+    logging.info(f"Loaded {table.num_rows} corpus records")
+    return table.to_pylist()
 def deduplicate_records(records):
     seen_references = set()
     deduplicated = []
@@ -75,13 +87,15 @@ def chunk_purport(record):
                     'chapter': record.get('chapter'),
                     'verse': record.get('verse'),
                     'url': record.get('url'),
-                    'original_purport': purport 
                 }
             })
     return chunk_data
 def main():
     logging.info("Starting indexing")
-    all_records = load_data(RAW_DATA_FILE)
+    if os.path.exists(CORPUS_FILE):
+        all_records = load_corpus(CORPUS_FILE)
+    else:
+        all_records = load_data(RAW_DATA_FILE)
     if all_records is None:
         return
     deduplicated = deduplicate_records(all_records)
@@ -0,0 +1,181 @@
+import json
+import os
+import re
+import logging
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from bs4 import BeautifulSoup
+from tqdm import tqdm
+from scripts.scraping.page_store import PageStore, PAGE_STORE_DIR
+from scripts.scraping.fetch import (
+    parse_url_details,
+    CONTENT_AREA_SELECTOR,
+    VERSE_TEXT_SELECTOR,
+    TRANSLATION_SELECTOR,
+    PURPORT_SELECTOR,
+)
+
+# Run from the repository root: python -m scripts.processing.extract_corpus
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SCRAPED_DATA_FILE = os.path.join(REPO_ROOT, 'data', 'scraped_sb', 'vedabase_sb.jsonl')
+CORPUS_FILE = os.path.join(REPO_ROOT, 'data', 'processed', 'sb_corpus.parquet')
+SYNONYMS_SELECTOR = 'div.av-synonyms'
+HTML_PARSER = 'lxml'
+MAX_WORKERS = os.cpu_count()
+POOL_CHUNKSIZE = 64
+
+# Section labels that get_text() leaves at the top of each block.
+SECTION_HEADINGS = {
+    'sanskrit_text': 'verse text',
+    'synonyms_text': 'synonyms',
+    'translation_text': 'translation',
+    'explanation_text': 'purport',
+}
+TEXT_FIELDS = list(SECTION_HEADINGS)
+CORPUS_COLUMNS = ['book', 'canto', 'chapter', 'verse', 'reference', 'page_type', 'url'] + TEXT_FIELDS
+CORPUS_SCHEMA = pa.schema([(name, pa.string()) for name in CORPUS_COLUMNS])
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPACE_AFTER_OPEN_RE = re.compile(r'([(“‘\[])\s+')
+_SPACE_BEFORE_CLOSE_RE = re.compile(r'\s+([)”\],.;:!?])')
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def normalize_inline(text):
+    """NFC-normalize diacritics and rejoin the fragments get_text() splits around inline tags."""
+    text = unicodedata.normalize('NFC', text)
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    text = _SPACE_AFTER_OPEN_RE.sub(r'\1', text)
+    return _SPACE_BEFORE_CLOSE_RE.sub(r'\1', text)
+
+def normalize_verse_lines(text):
+    """Like normalize_inline, but keeps the line breaks of the Sanskrit verse."""
+    lines = (normalize_inline(line) for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+def strip_heading(text, heading):
+    first, sep, rest = text.partition('\n')
+    if first.strip().lower() == heading:
+        return rest
+    return text
+
+def normalize_field(field, text):
+    if not text:
+        return None
+    text = strip_heading(unicodedata.normalize('NFC', text).strip(), SECTION_HEADINGS[field])
+    if field == 'sanskrit_text':
+        text = normalize_verse_lines(text)
+    else:
+        paragraphs = (normalize_inline(p) for p in text.split('\n\n'))
+        text = '\n\n'.join(p for p in paragraphs if p)
+    return text or None
+
+def block_text(block, field):
+    for heading in block.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        heading.decompose()
+    if field == 'sanskrit_text':
+        return block.get_text(separator='\n', strip=True)
+    paragraphs = [p.get_text(separator=' ', strip=True) for p in block.find_all('p')]
+    if not paragraphs:
+        paragraphs = [block.get_text(separator=' ', strip=True)]
+    return '\n\n'.join(paragraphs)
+
+def extract_html_page(item):
+    url, html = item
+    record = parse_url_details(url)
+    for field in TEXT_FIELDS:
+        record[field] = None
+    soup = BeautifulSoup(html, HTML_PARSER)
+    main_content = soup.select_one(CONTENT_AREA_SELECTOR)
+    if main_content:
+        selectors = {
+            'sanskrit_text': VERSE_TEXT_SELECTOR,
+            'synonyms_text': SYNONYMS_SELECTOR,
+            'translation_text': TRANSLATION_SELECTOR,
+            'explanation_text': PURPORT_SELECTOR,
+        }
+        for field, selector in selectors.items():
+            block = main_content.select_one(selector)
+            if block:
+                record[field] = normalize_field(field, block_text(block, field))
+    return record
+
+def normalize_scraped_record(record):
+    """Normalize a record from the scraped JSONL.
+
+    The scraper joined every text node with a single newline, so paragraph breaks are
+    already lost and each purport comes out as one paragraph. Build the corpus with
+    --from-page-store to keep the <p> boundaries that chunk_purport splits on.
+    """
+    record = dict(record)
+    for field in TEXT_FIELDS:
+        record[field] = normalize_field(field, record.get(field))
+    return record
+
+def load_scraped_records(filepath):
+    records = []
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line.strip()))
+                except json.JSONDecodeError as e:
+                    logging.warning(f"Invalid JSON line skipped: {e}")
+    except FileNotFoundError:
+        logging.error(f"Data file not found: {filepath}")
+        return None
+    logging.info(f"Loaded {len(records)} scraped records")
+    return records
+
+def process_parallel(fn, items, desc, initializer=None, initargs=()):
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=initializer, initargs=initargs) as pool:
+        return list(tqdm(pool.map(fn, items, chunksize=POOL_CHUNKSIZE), total=len(items), desc=desc))
+
+_page_store = None
+
+def _init_page_store_worker(page_store_dir):
+    global _page_store
+    _page_store = PageStore(page_store_dir)
+
+def extract_cached_page(url):
+    content = _page_store.get(url)
+    if content is None:
+        return None
+    return extract_html_page((url, content))
+
+def write_corpus(records, filepath):
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    rows = [{name: record.get(name) for name in CORPUS_COLUMNS} for record in records]
+    table = pa.Table.from_pylist(rows, schema=CORPUS_SCHEMA)
+    pq.write_table(table, filepath, compression='zstd')
+    logging.info(f"Wrote {table.num_rows} records to {filepath}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the normalized Parquet corpus.")
+    parser.add_argument('--from-page-store', action='store_true',
+                        help="Parse cached raw HTML instead of the scraped JSONL.")
+    parser.add_argument('--page-store', default=PAGE_STORE_DIR,
+                        help="Directory of the cached raw pages.")
+    args = parser.parse_args()
+    logging.info("Starting corpus extraction")
+    if args.from_page_store:
+        page_store = PageStore(args.page_store)
+        urls = page_store.urls()
+        page_store.close()
+        logging.info(f"Found {len(urls)} cached pages")
+        corpus = process_parallel(extract_cached_page, urls, "Parsing",
+                                  initializer=_init_page_store_worker, initargs=(args.page_store,))
+        corpus = [record for record in corpus if record is not None]
+    else:
+        records = load_scraped_records(SCRAPED_DATA_FILE)
+        if records is None:
+            return
+        corpus = process_parallel(normalize_scraped_record, records, "Normalizing")
+    write_corpus(corpus, CORPUS_FILE)
+    logging.info("Corpus extraction complete")
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,16 @@ import os
 import json
 from urllib.parse import urlparse, urljoin, urlunparse
 import traceback
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from scripts.scraping.page_store import PageStore, PAGE_STORE_DIR
 
 START_URL = 'https://vedabase.io/en/library/sb/1/1/advanced-view/'
 OUTPUT_FILENAME = 'vedabase_sb.jsonl'
-OUTPUT_DIR = '../../data/scraped_sb'
+REPLAY_OUTPUT_FILENAME = 'vedabase_sb_replay.jsonl'
+# Run from the repository root: python -m scripts.scraping.fetch
+OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'scraped_sb'))
 
 CONTENT_AREA_SELECTOR = 'main'
 VERSE_TEXT_SELECTOR = 'div.av-verse_text'
@@ -173,52 +179,161 @@ def find_first_canto_link_on_book_index(soup, base_url):
     except Exception as e: pass
     return None
 
-def scrape_and_process_page(url):
-    fetch_url = ensure_advanced_view_url(url)
-    if not fetch_url: return None, None
+def fetch_page_content(fetch_url, page_store=None):
+    headers = dict(HEADERS)
+    if page_store is not None:
+        headers.update(page_store.conditional_headers(fetch_url))
+    time.sleep(1.5)
+    response = requests.get(fetch_url, headers=headers, timeout=25)
+    if response.status_code == 304 and page_store is not None:
+        cached = page_store.get(fetch_url)
+        if cached is not None:
+            page_store.touch(fetch_url)
+            return cached
+        response = requests.get(fetch_url, headers=HEADERS, timeout=25)
+    response.raise_for_status()
+    if page_store is not None:
+        page_store.put(
+            fetch_url, response.content,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+    return response.content
+
+def empty_page_data(fetch_url):
     page_data = parse_url_details(fetch_url)
     page_data['sanskrit_text'] = None
     page_data['translation_text'] = None
     page_data['explanation_text'] = None
+    return page_data
+
+def process_page_content(fetch_url, content):
+    page_data = empty_page_data(fetch_url)
+    next_url_to_fetch = None
+    soup = BeautifulSoup(content, 'html.parser')
+    main_content = soup.select_one(CONTENT_AREA_SELECTOR)
+    if main_content:
+        verse_text_div = main_content.select_one(VERSE_TEXT_SELECTOR)
+        translation_div = main_content.select_one(TRANSLATION_SELECTOR)
+        purport_div = main_content.select_one(PURPORT_SELECTOR)
+        if verse_text_div: page_data['sanskrit_text'] = verse_text_div.get_text(separator='\n', strip=True)
+        if translation_div: page_data['translation_text'] = translation_div.get_text(separator='\n', strip=True)
+        if purport_div: page_data['explanation_text'] = purport_div.get_text(separator='\n', strip=True)
+        current_page_type = page_data.get('page_type')
+        raw_next_url = None
+        if current_page_type == 'Verse Page':
+            raw_next_url = find_next_page_link_on_verse(soup, fetch_url)
+        elif current_page_type == 'Chapter Index':
+            raw_next_url = find_first_verse_link_on_chapter_index(soup, fetch_url)
+        elif current_page_type == 'Canto Index':
+            raw_next_url = find_first_chapter_link_on_canto_index(soup, fetch_url)
+        elif current_page_type == 'Book Index':
+            raw_next_url = find_first_canto_link_on_book_index(soup, fetch_url)
+        else:
+            raw_next_url = find_next_page_link_on_verse(soup, fetch_url)
+        if raw_next_url:
+            next_url_to_fetch = ensure_advanced_view_url(raw_next_url)
+    return page_data, next_url_to_fetch
+
+def scrape_and_process_page(url, page_store=None):
+    fetch_url = ensure_advanced_view_url(url)
+    if not fetch_url: return None, None
+    page_data = empty_page_data(fetch_url)
     next_url_to_fetch = None
     try:
-        time.sleep(1.5)
-        response = requests.get(fetch_url, headers=HEADERS, timeout=25)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        main_content = soup.select_one(CONTENT_AREA_SELECTOR)
-        if main_content:
-            verse_text_div = main_content.select_one(VERSE_TEXT_SELECTOR)
-            translation_div = main_content.select_one(TRANSLATION_SELECTOR)
-            purport_div = main_content.select_one(PURPORT_SELECTOR)
-            if verse_text_div: page_data['sanskrit_text'] = verse_text_div.get_text(separator='\n', strip=True)
-            if translation_div: page_data['translation_text'] = translation_div.get_text(separator='\n', strip=True)
-            if purport_div: page_data['explanation_text'] = purport_div.get_text(separator='\n', strip=True)
-            current_page_type = page_data.get('page_type')
-            raw_next_url = None
-            if current_page_type == 'Verse Page':
-                raw_next_url = find_next_page_link_on_verse(soup, fetch_url)
-            elif current_page_type == 'Chapter Index':
-                raw_next_url = find_first_verse_link_on_chapter_index(soup, fetch_url)
-            elif current_page_type == 'Canto Index':
-                raw_next_url = find_first_chapter_link_on_canto_index(soup, fetch_url)
-            elif current_page_type == 'Book Index':
-                raw_next_url = find_first_canto_link_on_book_index(soup, fetch_url)
-            else:
-                raw_next_url = find_next_page_link_on_verse(soup, fetch_url)
-            if raw_next_url:
-                next_url_to_fetch = ensure_advanced_view_url(raw_next_url)
+        content = fetch_page_content(fetch_url, page_store)
+        page_data, next_url_to_fetch = process_page_content(fetch_url, content)
     except requests.exceptions.RequestException as e: pass
     except Exception as e: pass
     return page_data, next_url_to_fetch
 
+def prepare_page_record(page_data):
+    if not isinstance(page_data, dict):
+        return None
+    page_type = page_data.get('page_type')
+    if page_type == 'Verse Page':
+        if page_data.get('translation_text') or page_data.get('explanation_text'):
+            return page_data
+        return None
+    if page_type in ['Chapter Index', 'Canto Index', 'Book Index', 'Introduction']:
+        page_data.pop('sanskrit_text', None)
+        page_data.pop('translation_text', None)
+        page_data.pop('explanation_text', None)
+    return page_data
+
+_replay_store = None
+
+def _init_replay_worker(page_store_dir):
+    global _replay_store
+    _replay_store = PageStore(page_store_dir)
+
+def replay_page(fetch_url):
+    try:
+        content = _replay_store.get(fetch_url)
+        if content is None:
+            return fetch_url, None, "missing blob"
+        page_data, _ = process_page_content(fetch_url, content)
+    except Exception as e:
+        return fetch_url, None, f"{type(e).__name__}: {e}"
+    return fetch_url, prepare_page_record(page_data), None
+
+def replay_page_store(page_store, output_filepath):
+    """Re-run extraction over every cached page without touching the network.
+
+    Records go to a temporary file that only replaces `output_filepath` once every page
+    has been processed. Returns counts of records written, pages skipped by the usual save
+    rules, and pages whose extraction failed; each failure is logged with its URL.
+    """
+    counts = {'written': 0, 'skipped': 0, 'failed': 0}
+    tmp_filepath = output_filepath + '.tmp'
+    try:
+        with ProcessPoolExecutor(initializer=_init_replay_worker, initargs=(page_store.root,)) as pool, \
+                open(tmp_filepath, 'w', encoding='utf-8') as f:
+            for fetch_url, record, error in pool.map(replay_page, page_store.urls(), chunksize=32):
+                if error is not None:
+                    counts['failed'] += 1
+                    logging.warning(f"Replay failed for {fetch_url}: {error}")
+                elif record is None:
+                    counts['skipped'] += 1
+                else:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    counts['written'] += 1
+        os.replace(tmp_filepath, output_filepath)
+    except BaseException:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        raise
+    return counts
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl vedabase.io Srimad Bhagavatam pages.")
+    parser.add_argument('--replay', action='store_true',
+                        help="Re-extract records from the local page store instead of crawling.")
+    parser.add_argument('--page-store', default=PAGE_STORE_DIR,
+                        help="Directory of the cached raw pages.")
+    parser.add_argument('--output', default=os.path.join(OUTPUT_DIR, REPLAY_OUTPUT_FILENAME),
+                        help="Where --replay writes its records; defaults to a file beside the crawl output.")
+    args = parser.parse_args()
     parsed_start_url = urlparse(START_URL)
     robots_url = f"{parsed_start_url.scheme}://{parsed_start_url.netloc}/robots.txt"
     if not os.path.exists(OUTPUT_DIR):
         try: os.makedirs(OUTPUT_DIR)
         except OSError as e: exit()
     output_filepath = os.path.join(OUTPUT_DIR, OUTPUT_FILENAME)
+    page_store = PageStore(args.page_store)
+    if args.replay:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        if len(page_store) == 0:
+            logging.error(f"Page store {args.page_store} is empty; nothing to replay.")
+            page_store.close()
+            exit(1)
+        counts = replay_page_store(page_store, args.output)
+        logging.info(
+            f"Replayed {len(page_store)} cached pages into {args.output}: "
+            f"{counts['written']} written, {counts['skipped']} skipped, {counts['failed']} failed"
+        )
+        page_store.close()
+        exit()
     processed_urls = set()
     current_url = START_URL
     page_count = 0
@@ -232,20 +347,8 @@ if __name__ == "__main__":
                     break
                 processed_urls.add(current_url)
                 page_count += 1
-                page_data, next_url = scrape_and_process_page(current_url)
-                save_this_page = False
-                if isinstance(page_data, dict):
-                    page_type = page_data.get('page_type')
-                    if page_type == 'Verse Page':
-                        if page_data.get('translation_text') or page_data.get('explanation_text'):
-                            save_this_page = True
-                    elif page_type in ['Chapter Index', 'Canto Index', 'Book Index', 'Introduction']:
-                        save_this_page = True
-                        page_data.pop('sanskrit_text', None)
-                        page_data.pop('translation_text', None)
-                        page_data.pop('explanation_text', None)
-                    else:
-                        save_this_page = True
+                page_data, next_url = scrape_and_process_page(current_url, page_store)
+                save_this_page = prepare_page_record(page_data) is not None
                 if save_this_page:
                     try:
                         json_record = json.dumps(page_data, ensure_ascii=False)
@@ -260,4 +363,5 @@ if __name__ == "__main__":
                 if error_count >= max_errors: break
                 current_url = next_url
     except IOError as e: exit()
-    except KeyboardInterrupt: pass
\ No newline at end of file
+    except KeyboardInterrupt: pass
+    finally: page_store.close()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import time
+import hashlib
+import sqlite3
+import zstandard
+
+PAGE_STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'page_store'))
+INDEX_FILENAME = 'index.sqlite3'
+BLOB_DIRNAME = 'blobs'
+ZSTD_LEVEL = 10
+
+class PageStore:
+    """Compressed, content-addressed cache of fetched pages.
+
+    Bodies are stored once per SHA-256 as zstd blobs; a SQLite index maps each URL
+    to its current blob together with the ETag / Last-Modified validators and fetch time.
+    Index rows keep their first-insert order, so iterating replays the crawl order.
+    """
+
+    def __init__(self, root=PAGE_STORE_DIR):
+        self.root = root
+        self.blob_dir = os.path.join(root, BLOB_DIRNAME)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, INDEX_FILENAME))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256[:2], f"{sha256}.zst")
+
+    def lookup(self, url):
+        row = self.conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def read_blob(self, sha256):
+        with open(self._blob_path(sha256), 'rb') as f:
+            return self._decompressor.decompress(f.read())
+
+    def get(self, url):
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        return self.read_blob(entry['sha256'])
+
+    def put(self, url, content, etag=None, last_modified=None):
+        sha256 = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(sha256)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = blob_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self._compressor.compress(content))
+            os.replace(tmp_path, blob_path)
+        self.conn.execute(
+            """INSERT INTO pages (url, sha256, etag, last_modified, fetched_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(url) DO UPDATE SET
+                   sha256 = excluded.sha256,
+                   etag = excluded.etag,
+                   last_modified = excluded.last_modified,
+                   fetched_at = excluded.fetched_at""",
+            (url, sha256, etag, last_modified, time.time()),
+        )
+        self.conn.commit()
+        return sha256
+
+    def touch(self, url):
+        """Record a successful revalidation (304) without rewriting the blob."""
+        self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        self.conn.commit()
+
+    def conditional_headers(self, url):
+        entry = self.lookup(url)
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def urls(self):
+        return [row['url'] for row in self.conn.execute("SELECT url FROM pages ORDER BY rowid")]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
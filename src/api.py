@@ -1,11 +1,36 @@
+import os
 import logging
 from flask import Flask, request, jsonify, render_template
 from .rag_pipeline import get_rag_response
+from .rag_steps import BLOCKED_PREFIX
+from .coalescing import SingleFlight, make_query_key
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 app = Flask(__name__)
 
+COALESCE_TIMEOUT = float(os.getenv('COALESCE_TIMEOUT', 60))
+query_flight = SingleFlight()
+
+class QueryFailed(Exception):
+    """An "Error: ..." answer from get_rag_response, raised so coalesced callers all see a failure.
+
+    `status` is 422 when the model's safety filter blocked the answer and 502 when retrieval,
+    generation or initialisation failed.
+    """
+
+    def __init__(self, message: str, status: int = 502):
+        super().__init__(message)
+        self.status = status
+
+def answer_question(question: str) -> str:
+    answer = get_rag_response(question)
+    if answer.startswith(BLOCKED_PREFIX):
+        raise QueryFailed(answer.removeprefix("Error:").strip(), status=422)
+    if answer.startswith("Error:"):
+        raise QueryFailed(answer.removeprefix("Error:").strip())
+    return answer
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -24,12 +49,26 @@ def handle_query():
     app.logger.info(f"Query received: '{question}'")
 
     try:
-        answer = get_rag_response(question)
+        answer = query_flight.do(
+            make_query_key(question),
+            lambda: answer_question(question),
+            timeout=COALESCE_TIMEOUT
+        )
         app.logger.info(f"Answer (truncated): '{answer[:100]}...'")
         return jsonify({"answer": answer})
+    except QueryFailed as e:
+        app.logger.warning(f"Query failed: {e}")
+        return jsonify({"error": str(e)}), e.status
+    except TimeoutError as e:
+        app.logger.warning(f"Coalesced query timed out: {e}")
+        return jsonify({"error": "Timed out waiting for the answer. Please try again."}), 504
     except Exception as e:
         app.logger.exception(f"Error handling query: {e}")
         return jsonify({"error": "Internal server error."}), 500
 
+@app.route('/stats/coalescing', methods=['GET'])
+def coalescing_stats():
+    return jsonify(query_flight.stats())
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,78 @@
+import re
+import copy
+import threading
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def make_query_key(question: str, **scope) -> tuple:
+    """Key identical questions together: case- and whitespace-insensitive, plus any scope filters."""
+    normalized = _WHITESPACE_RE.sub(' ', question).strip().casefold()
+    return (normalized, tuple(sorted(scope.items())))
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def _copy_error(error: BaseException) -> BaseException:
+    try:
+        return copy.copy(error).with_traceback(None)
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome.
+
+    The first caller (the leader) executes the function. Callers that arrive while it is in
+    flight (followers) block until it finishes and receive the same result, or a fresh copy
+    of its exception chained to the original, so each thread gets its own traceback. A follower that waits longer than `timeout` gets TimeoutError; the
+    leader keeps running and still serves everyone else.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'leaders': 0, 'coalesced': 0, 'follower_timeouts': 0, 'errors': 0}
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['leaders'] += 1
+                leader = True
+            else:
+                self._stats['coalesced'] += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._stats['follower_timeouts'] += 1
+            raise TimeoutError(f"Timed out after {timeout}s waiting for an identical in-flight query")
+        if call.error is not None:
+            raise _copy_error(call.error) from call.error
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        # Followers that timed out were spared an upstream call but never got an answer.
+        stats['upstream_calls_saved'] = stats['coalesced'] - stats['follower_timeouts']
+        return stats
@@ -4,6 +4,8 @@ import chromadb
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
 import google.generativeai as genai
+from .verse_index import VerseIndex
+from .rag_steps import NO_ANSWER, retrieve_context, generate_answer
 
 load_dotenv()
 log = logging.getLogger(__name__)
@@ -13,11 +15,15 @@ COLLECTION_NAME = os.getenv('COLLECTION_NAME', "prabhupada_purports")
 EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
 GENERATION_MODEL_NAME = os.getenv('GENERATION_MODEL_NAME', 'gemini-1.5-flash')
 N_RESULTS = int(os.getenv('N_RESULTS', 5))
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'chunk')
+VERSE_CORPUS_PATH = os.getenv('VERSE_CORPUS_PATH', 'data/processed/sb_corpus.parquet')
+NEIGHBOR_VERSES = int(os.getenv('NEIGHBOR_VERSES', 1))
 API_KEY = os.getenv("GEMINI_API_KEY")
 
 embedding_model = None
 chroma_collection = None
 generation_model = None
+verse_index = None
 IS_INITIALIZED = False
 
 try:
@@ -39,38 +45,13 @@ try:
 
 except Exception as e:
     log.exception(f"Initialization failed: {e}")
-def build_prompt(question: str, context_chunks: list[dict]) -> str | None:
-    if not context_chunks:
-        return None
-
-    refs = set()
-    context = []
-    for i, chunk in enumerate(context_chunks):
-        doc = chunk.get('document', '')
-        ref = chunk.get('metadata', {}).get('reference', 'Unknown Reference')
-        refs.add(ref)
-        context.append(f"Context Chunk {i+1} (Reference: {ref}):\n{doc}")
-
-    joined_context = "\n\n".join(context)
-    ref_list = ', '.join(sorted(refs))
-
-    return f"""You are a helpful assistant answering questions based *only* on the provided context derived from Srila Prabhupada's purports on the Srimad Bhagavatam.
-
-User Question: {question}
-
-Context from Srimad Bhagavatam Purports:
---- Start of Context ---
-{joined_context}
---- End of Context ---
-
-Instructions:
-1. Use only the context above to answer the question.
-2. Do not add any external information.
-3. Cite specific verse references from: {ref_list}.
-4. If the context doesn't address the question, say: "The Srimad Bhagavatam purports queried do not specifically address that question."
-5. Be concise, factual, and neutral.
 
-Answer:"""
+if RETRIEVAL_MODE == 'verse':
+    try:
+        corpus_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', VERSE_CORPUS_PATH))
+        verse_index = VerseIndex.from_parquet(corpus_path)
+    except Exception as e:
+        log.exception(f"Verse index unavailable, falling back to chunk retrieval: {e}")
 
 def get_rag_response(question: str) -> str:
     log.info(f"RAG question: {question}")
@@ -79,34 +60,15 @@ def get_rag_response(question: str) -> str:
         return "Error: The chatbot components failed to initialize. Please try again later."
 
     try:
-        query_vec = embedding_model.encode(question).tolist()
-        results = chroma_collection.query(
-            query_embeddings=[query_vec],
-            n_results=N_RESULTS,
-            include=['documents', 'metadatas']
+        context_chunks = retrieve_context(
+            question, embedding_model, chroma_collection, N_RESULTS,
+            verse_index=verse_index, n_neighbours=NEIGHBOR_VERSES
         )
     except Exception as e:
         log.exception(f"Retrieval error: {e}")
         return "Error: Could not retrieve information from the knowledge base."
 
-    context_chunks = []
-    if results and results.get('ids', [[]])[0]:
-        for id_, doc, meta in zip(results['ids'][0], results['documents'][0], results['metadatas'][0]):
-            context_chunks.append({'id': id_, 'document': doc, 'metadata': meta})
-    else:
-        return "The Srimad Bhagavatam purports queried do not specifically address that question."
-
-    prompt = build_prompt(question, context_chunks)
-    if not prompt:
-        return "The Srimad Bhagavatam purports queried do not specifically address that question."
+    if not context_chunks:
+        return NO_ANSWER
 
-    try:
-        response = generation_model.generate_content(prompt)
-        if response.parts:
-            return response.text.strip()
-        if response.prompt_feedback:
-            return f"Error: Response blocked ({response.prompt_feedback}). Try rephrasing."
-        return "Error: Received an empty response from the language model."
-    except Exception as e:
-        log.exception(f"LLM generation error: {e}")
-        return "Error: Failed to generate an answer from the language model."
+    return generate_answer(question, context_chunks, generation_model)
@@ -0,0 +1,116 @@
+import logging
+from .verse_index import VerseIndex
+
+log = logging.getLogger(__name__)
+
+NO_ANSWER = "The Srimad Bhagavatam purports queried do not specifically address that question."
+BLOCKED_PREFIX = "Error: Response blocked"
+
+def group_chunks_by_verse(context_chunks: list[dict], index: VerseIndex, n_neighbours: int = 0) -> list[dict]:
+    """Collapse chunk hits into one context entry per verse, expanded with its parent record.
+
+    Groups keep the rank of their best chunk. Each group carries the verse translation, the
+    matched purport passages and the translations of up to `n_neighbours` verses either side
+    in the same chapter; all parent rows are read from the index in a single bulk fetch.
+    """
+    groups = {}
+    for chunk in context_chunks:
+        ref = chunk.get('metadata', {}).get('reference', 'Unknown Reference')
+        groups.setdefault(ref, []).append(chunk)
+
+    neighbourhoods = {ref: index.neighbourhood(ref, n_neighbours) for ref in groups}
+    records = index.fetch(pos for positions in neighbourhoods.values() for pos in positions)
+
+    grouped = []
+    seen = set()
+    for ref, chunks in groups.items():
+        passages = "\n\n".join(c.get('document', '') for c in chunks)
+        parent = records.get(ref)
+        if parent is None:
+            grouped.append({'id': ref, 'document': passages, 'metadata': chunks[0].get('metadata', {})})
+            continue
+        seen.add(ref)
+        sections = []
+        for pos in neighbourhoods[ref]:
+            neighbour_ref = index.references[pos]
+            if neighbour_ref == ref:
+                sections.append(f"Translation ({ref}): {parent.get('translation_text') or ''}")
+                sections.append(f"Purport passages ({ref}):\n{passages}")
+            elif neighbour_ref not in groups and neighbour_ref not in seen:
+                seen.add(neighbour_ref)
+                sections.append(f"Translation ({neighbour_ref}): {records[neighbour_ref].get('translation_text') or ''}")
+        metadata = dict(chunks[0].get('metadata', {}))
+        metadata['neighbour_references'] = [
+            index.references[pos] for pos in neighbourhoods[ref] if index.references[pos] != ref
+        ]
+        grouped.append({'id': ref, 'document': "\n\n".join(sections), 'metadata': metadata})
+    return grouped
+
+def build_prompt(question: str, context_chunks: list[dict]) -> str | None:
+    if not context_chunks:
+        return None
+
+    refs = set()
+    context = []
+    for i, chunk in enumerate(context_chunks):
+        doc = chunk.get('document', '')
+        ref = chunk.get('metadata', {}).get('reference', 'Unknown Reference')
+        refs.add(ref)
+        refs.update(chunk.get('metadata', {}).get('neighbour_references', []))
+        context.append(f"Context Chunk {i+1} (Reference: {ref}):\n{doc}")
+
+    joined_context = "\n\n".join(context)
+    ref_list = ', '.join(sorted(refs))
+
+    return f"""You are a helpful assistant answering questions based *only* on the provided context derived from Srila Prabhupada's purports on the Srimad Bhagavatam.
+
+User Question: {question}
+
+Context from Srimad Bhagavatam Purports:
+--- Start of Context ---
+{joined_context}
+--- End of Context ---
+
+Instructions:
+1. Use only the context above to answer the question.
+2. Do not add any external information.
+3. Cite specific verse references from: {ref_list}.
+4. If the context doesn't address the question, say: "The Srimad Bhagavatam purports queried do not specifically address that question."
+5. Be concise, factual, and neutral.
+
+Answer:"""
+
+def retrieve_context(question: str, embedding_model, collection, n_results: int,
+                     verse_index: VerseIndex | None = None, n_neighbours: int = 0) -> list[dict]:
+    """Embed the question, query the collection and, with a verse index, expand hits to verses."""
+    query_vec = embedding_model.encode(question).tolist()
+    results = collection.query(
+        query_embeddings=[query_vec],
+        n_results=n_results,
+        include=['documents', 'metadatas']
+    )
+
+    context_chunks = []
+    if results and results.get('ids', [[]])[0]:
+        for id_, doc, meta in zip(results['ids'][0], results['documents'][0], results['metadatas'][0]):
+            context_chunks.append({'id': id_, 'document': doc, 'metadata': meta})
+
+    if context_chunks and verse_index is not None:
+        context_chunks = group_chunks_by_verse(context_chunks, verse_index, n_neighbours)
+    return context_chunks
+
+def generate_answer(question: str, context_chunks: list[dict], generation_model) -> str:
+    prompt = build_prompt(question, context_chunks)
+    if not prompt:
+        return NO_ANSWER
+
+    try:
+        response = generation_model.generate_content(prompt)
+        if response.parts:
+            return response.text.strip()
+        if response.prompt_feedback:
+            return f"{BLOCKED_PREFIX} ({response.prompt_feedback}). Try rephrasing."
+        return "Error: Received an empty response from the language model."
+    except Exception as e:
+        log.exception(f"LLM generation error: {e}")
+        return "Error: Failed to generate an answer from the language model."
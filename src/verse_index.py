@@ -0,0 +1,68 @@
+import re
+import logging
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+log = logging.getLogger(__name__)
+
+VERSE_COLUMNS = ['reference', 'canto', 'chapter', 'verse', 'url', 'translation_text', 'explanation_text']
+
+def _leading_int(value):
+    match = re.match(r'\d+', str(value or ''))
+    return int(match.group()) if match else None
+
+class VerseIndex:
+    """Parent verse records from the processed corpus, in canto/chapter/verse order.
+
+    `positions` maps each reference to its row in the reference-ordered table, so the
+    neighbours of a verse are simply the adjacent rows that share its canto and chapter.
+    """
+
+    def __init__(self, table):
+        keys = []
+        seen_references = set()
+        for i, (reference, canto, chapter, verse) in enumerate(zip(
+            table.column('reference').to_pylist(),
+            table.column('canto').to_pylist(),
+            table.column('chapter').to_pylist(),
+            table.column('verse').to_pylist(),
+        )):
+            # The crawler appends to its output, so keep only the first row per verse.
+            if reference in seen_references:
+                continue
+            key = (_leading_int(canto), _leading_int(chapter), _leading_int(verse))
+            if None not in key:
+                seen_references.add(reference)
+                keys.append((key, i))
+        keys.sort()
+        self.table = table.take([i for _, i in keys])
+        self.chapter_keys = [key[:2] for key, _ in keys]
+        self.references = self.table.column('reference').to_pylist()
+        self.positions = {ref: pos for pos, ref in enumerate(self.references)}
+
+    @classmethod
+    def from_parquet(cls, path):
+        table = pq.read_table(path, columns=VERSE_COLUMNS + ['page_type'])
+        table = table.filter(pc.equal(table.column('page_type'), 'Verse Page')).select(VERSE_COLUMNS)
+        index = cls(table)
+        log.info(f"Verse index loaded with {len(index)} verses")
+        return index
+
+    def __len__(self):
+        return len(self.references)
+
+    def neighbourhood(self, reference, n_neighbours=0):
+        pos = self.positions.get(reference)
+        if pos is None:
+            return []
+        chapter = self.chapter_keys[pos]
+        lo = max(0, pos - n_neighbours)
+        hi = min(len(self.references), pos + n_neighbours + 1)
+        return [p for p in range(lo, hi) if self.chapter_keys[p] == chapter]
+
+    def fetch(self, positions):
+        """Bulk-read the given rows in one take and return them keyed by reference."""
+        positions = sorted(set(positions))
+        if not positions:
+            return {}
+        return {row['reference']: row for row in self.table.take(positions).to_pylist()}